@@ -1,11 +1,20 @@
 import fastf1
+import io
+import os
 import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from itertools import repeat
 import logging
 
 # Set FastF1 logging level first
 fastf1.set_log_level('CRITICAL')
 
+# Enable FastF1 cache once per process, creating the directory if it doesn't exist yet
+os.makedirs('cache', exist_ok=True)
+fastf1.Cache.enable_cache('cache')
+
 # Set up logging for our script only
 script_logger = logging.getLogger('f1_data_extractor')
 script_logger.setLevel(logging.INFO)
@@ -45,36 +54,59 @@ Abu Dhabi Grand Prix (December 8, 2024) - Lando Norris won the season finale at
 for McLaren with a commanding performance."""
 }
 
-def format_timedelta(td):
-    """Format timedelta to readable string."""
-    if pd.isna(td):
-        return "No time"
-    total_seconds = td.total_seconds()
-    minutes = int(total_seconds // 60)
+def section(title):
+    """Return a section header: the title underlined with '=' to its full length."""
+    return f"{title}\n{'=' * len(title)}\n"
+
+def format_timedelta_series(series):
+    """Format a timedelta Series to readable strings in a single vectorized pass."""
+    total_seconds = series.dt.total_seconds().to_numpy()
+    valid = ~np.isnan(total_seconds)
+    total_seconds = np.where(valid, total_seconds, 0.0)
+    minutes = (total_seconds // 60).astype(int)
     seconds = total_seconds % 60
-    return f"{minutes}:{seconds:06.3f}"
+    formatted = np.char.add(np.char.add(minutes.astype(str), ':'), np.char.mod('%06.3f', seconds))
+    return np.where(valid, formatted, "No time")
+
+def split_car_data_by_lap(session, driver_number, driver_laps):
+    """Bin a driver's session car data into laps once, keyed by lap number."""
+    car_data = session.car_data.get(driver_number)
+    if car_data is None or car_data.empty:
+        return {}
+    lap_bounds = (driver_laps[['LapNumber', 'LapStartTime', 'Time']]
+                  .dropna()
+                  .rename(columns={'Time': 'LapEndTime'})
+                  .sort_values('LapStartTime'))
+    binned = pd.merge_asof(
+        car_data.sort_values('SessionTime'),
+        lap_bounds,
+        left_on='SessionTime',
+        right_on='LapStartTime',
+        direction='backward'
+    )
+    # Drop samples after a lap's end (e.g. in-lap to the garage after the last timed lap)
+    binned = binned[binned['SessionTime'] <= binned['LapEndTime']]
+    return {lap_number: lap_data for lap_number, lap_data in binned.groupby('LapNumber', sort=False)}
 
 def extract_race_data(year, event, session_type="Race", description=None):
     """Extract comprehensive race data in LLM-friendly format."""
     
-    script_logger.info(f"🏎️ Starting data extraction for {event} {year} - {session_type}")
+    script_logger.info("🏎️ Starting data extraction for %s %s - %s", event, year, session_type)
     
-    fastf1.Cache.enable_cache('cache')
     session = fastf1.get_session(year, event, session_type)
     session.load()
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"race_data_{event}_{year}_{session_type}.txt"
     
-    with open(filename, 'w', encoding='utf-8') as f:
+    with io.StringIO() as f:
         # Add race description if provided
         if description:
             f.write(f"{description}\n\n")
             f.write("="*50 + "\n\n")
         
         # Event Summary with clear structure
-        f.write("EVENT SUMMARY\n")
-        f.write("=============\n")
+        f.write(section("EVENT SUMMARY"))
         f.write(f"Grand Prix: {session.event.EventName}\n")
         f.write(f"Year: {year}\n")
         f.write(f"Session: {session_type}\n")
@@ -83,202 +115,219 @@ def extract_race_data(year, event, session_type="Race", description=None):
         f.write(f"Country: {session.event.Country}\n\n")
 
         # Add new comprehensive session summary
-        f.write("SESSION OVERVIEW\n")
-        f.write("===============\n")
+        f.write(section("SESSION OVERVIEW"))
         
         # Overall fastest lap
         all_laps = session.laps
-        if not all_laps.empty:
-            fastest_lap = all_laps.pick_fastest()
-            if fastest_lap is not None:
-                driver_info = session.get_driver(fastest_lap['DriverNumber'])
-                f.write(f"Fastest Lap Overall: {format_timedelta(fastest_lap['LapTime'])}\n")
-                f.write(f"  Set by: {driver_info['FullName']} (Lap {fastest_lap['LapNumber']})\n")
-                if 'Sector1Time' in fastest_lap:
-                    f.write(f"  Sectors: S1={format_timedelta(fastest_lap['Sector1Time'])} | "
-                           f"S2={format_timedelta(fastest_lap['Sector2Time'])} | "
-                           f"S3={format_timedelta(fastest_lap['Sector3Time'])}\n")
+        if all_laps['LapTime'].notna().any():
+            # A single argmin scan, reading only the scalars we need from that row
+            fastest_idx = all_laps['LapTime'].idxmin()
+            driver_info = session.get_driver(all_laps.at[fastest_idx, 'DriverNumber'])
+            # Format the lap and sector times of the fastest lap together
+            time_columns = [column for column in ('LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time')
+                            if column in all_laps.columns]
+            fastest_times = all_laps.loc[[fastest_idx], time_columns]
+            fastest_strs = {column: format_timedelta_series(fastest_times[column])[0] for column in time_columns}
+            f.write(f"Fastest Lap Overall: {fastest_strs['LapTime']}\n")
+            f.write(f"  Set by: {driver_info['FullName']} (Lap {all_laps.at[fastest_idx, 'LapNumber']})\n")
+            if 'Sector1Time' in fastest_strs:
+                f.write(f"  Sectors: S1={fastest_strs['Sector1Time']} | "
+                       f"S2={fastest_strs['Sector2Time']} | "
+                       f"S3={fastest_strs['Sector3Time']}\n")
 
         # Session specific information
         if session_type == "Race":
             f.write("\nRACE CLASSIFICATION:\n")
-            results = session.results.copy()
-            results = results.sort_values('Position')
-            for idx, driver in results.iterrows():
-                status = "Finished" if driver['Status'] == "Finished" else driver['Status']
-                gap = driver.get('Time', driver.get('Gap', 'No time'))
-                position = int(driver['Position'])  # Convert float to int
-                f.write(f"P{position:2d}: {driver['FullName']:<20} ({driver['TeamName']}) - {status} ({gap})\n")
+            results = session.results.sort_values('Position', kind='stable', ignore_index=True)
+            gap_column = next((col for col in ('Time', 'Gap') if col in results.columns), None)
+            gaps = results[gap_column].astype(str) if gap_column else "No time"
+            # Build the whole classification block column-wise and write it once
+            lines = ("P" + results['Position'].astype(int).astype(str).str.rjust(2)
+                     + ": " + results['FullName'].astype(str).str.ljust(20)
+                     + " (" + results['TeamName'].astype(str) + ") - " + results['Status'].astype(str)
+                     + " (" + gaps + ")\n")
+            f.write("".join(lines))
         elif session_type == "Qualifying":
             f.write("\nQUALIFYING RESULTS:\n")
-            results = session.results.copy()
-            results = results.sort_values('Position')
-            for idx, driver in results.iterrows():
-                q3_time = format_timedelta(driver.get('Q3', pd.NaT))
-                q2_time = format_timedelta(driver.get('Q2', pd.NaT))
-                q1_time = format_timedelta(driver.get('Q1', pd.NaT))
-                f.write(f"P{driver['Position']:2d}: {driver['FullName']:<20} | Q1: {q1_time} | Q2: {q2_time} | Q3: {q3_time}\n")
+            results = session.results.sort_values('Position', kind='stable', ignore_index=True)
+            q_times = {q: format_timedelta_series(results[q]) if q in results.columns else "No time"
+                       for q in ('Q1', 'Q2', 'Q3')}
+            lines = ("P" + results['Position'].astype(int).astype(str).str.rjust(2)
+                     + ": " + results['FullName'].astype(str).str.ljust(20)
+                     + " | Q1: " + q_times['Q1'] + " | Q2: " + q_times['Q2'] + " | Q3: " + q_times['Q3'] + "\n")
+            f.write("".join(lines))
 
         # Track conditions and weather - Updated implementation
         f.write("\nTRACK CONDITIONS:\n")
         weather_data = session.weather_data
         if not weather_data.empty:
-            # Convert weather time to timedelta for comparison
-            weather_data['Time'] = pd.to_timedelta(weather_data['Time'])
-            
-            # Merge weather data with laps for accurate temperature readings
-            laps_with_weather = session.laps.copy()
-            laps_with_weather['WeatherTime'] = laps_with_weather['LapStartTime'].apply(
-                lambda x: weather_data['Time'].iloc[(weather_data['Time'] - x).abs().argmin()]
-            )
-            
-            # Merge the weather data
-            laps_with_weather = pd.merge_asof(
-                laps_with_weather.sort_values('LapStartTime'),
-                weather_data[['Time', 'AirTemp', 'Humidity', 'Pressure', 'Rainfall', 'TrackTemp']].sort_values('Time'),
-                left_on='LapStartTime',
-                right_on='Time',
-                direction='nearest'
-            )
-            
-            # Calculate weather statistics
+            # Summary stats only need the session's weather samples, not a per-lap alignment
+            weather_stats = weather_data[['AirTemp', 'TrackTemp', 'Humidity', 'Pressure']].agg(['min', 'max', 'mean'])
             f.write("Temperature and Weather Conditions:\n")
-            f.write(f"Air Temperature    - Min: {laps_with_weather['AirTemp'].min():.1f}°C, "
-                   f"Max: {laps_with_weather['AirTemp'].max():.1f}°C, "
-                   f"Avg: {laps_with_weather['AirTemp'].mean():.1f}°C\n")
-            f.write(f"Track Temperature  - Min: {laps_with_weather['TrackTemp'].min():.1f}°C, "
-                   f"Max: {laps_with_weather['TrackTemp'].max():.1f}°C, "
-                   f"Avg: {laps_with_weather['TrackTemp'].mean():.1f}°C\n")
-            f.write(f"Humidity          - Min: {laps_with_weather['Humidity'].min():.1f}%, "
-                   f"Max: {laps_with_weather['Humidity'].max():.1f}%, "
-                   f"Avg: {laps_with_weather['Humidity'].mean():.1f}%\n")
-            f.write(f"Pressure          - Min: {laps_with_weather['Pressure'].min():.1f}bar, "
-                   f"Max: {laps_with_weather['Pressure'].max():.1f}bar, "
-                   f"Avg: {laps_with_weather['Pressure'].mean():.1f}bar\n")
-            if laps_with_weather['Rainfall'].any():
+            f.write(f"Air Temperature    - Min: {weather_stats.at['min', 'AirTemp']:.1f}°C, "
+                   f"Max: {weather_stats.at['max', 'AirTemp']:.1f}°C, "
+                   f"Avg: {weather_stats.at['mean', 'AirTemp']:.1f}°C\n")
+            f.write(f"Track Temperature  - Min: {weather_stats.at['min', 'TrackTemp']:.1f}°C, "
+                   f"Max: {weather_stats.at['max', 'TrackTemp']:.1f}°C, "
+                   f"Avg: {weather_stats.at['mean', 'TrackTemp']:.1f}°C\n")
+            f.write(f"Humidity          - Min: {weather_stats.at['min', 'Humidity']:.1f}%, "
+                   f"Max: {weather_stats.at['max', 'Humidity']:.1f}%, "
+                   f"Avg: {weather_stats.at['mean', 'Humidity']:.1f}%\n")
+            f.write(f"Pressure          - Min: {weather_stats.at['min', 'Pressure']:.1f}bar, "
+                   f"Max: {weather_stats.at['max', 'Pressure']:.1f}bar, "
+                   f"Avg: {weather_stats.at['mean', 'Pressure']:.1f}bar\n")
+            if weather_data['Rainfall'].any():
                 f.write("Rainfall detected during session\n")
         
         # Session statistics
         f.write("\nSESSION STATISTICS:\n")
-        total_laps = len(session.laps)
-        completed_laps = len(session.laps[pd.notna(session.laps['LapTime'])])
+        total_laps = len(session.laps.index)
+        completed_laps = int(session.laps['LapTime'].count())
         f.write(f"Total Laps: {total_laps}\n")
         f.write(f"Completed Laps: {completed_laps}\n")
         f.write(f"Completion Rate: {(completed_laps/total_laps*100):.1f}%\n\n")
 
         # Detailed lap-by-lap analysis for each driver
-        f.write("LAP-BY-LAP ANALYSIS\n")
-        f.write("===================\n")
+        f.write(section("LAP-BY-LAP ANALYSIS"))
         results = session.results
+        # Partition laps by driver once instead of scanning all laps for every driver
+        laps_by_driver = session.laps.groupby('DriverNumber', sort=False)
+        # Per-driver fastest and average lap times from one grouped reduction
+        timed_laps = session.laps.dropna(subset=['LapTime'])
+        lap_time_stats = timed_laps.groupby('DriverNumber')['LapTime'].agg(['min', 'idxmin', 'mean'])
+        # Format every driver's fastest and average lap time in one vectorized pass
+        lap_time_stats['min_str'] = format_timedelta_series(lap_time_stats['min'])
+        lap_time_stats['mean_str'] = format_timedelta_series(lap_time_stats['mean'])
+        # Optional lap columns are part of the schema, so check for them once up front
+        has_sectors = 'Sector1Time' in session.laps.columns
+        has_speed_traps = 'SpeedI1' in session.laps.columns
+        has_compound = 'Compound' in session.laps.columns
+        has_personal_best = 'IsPersonalBest' in session.laps.columns
+        has_invalid = 'Invalid' in session.laps.columns
 
-        for _, driver in results.iterrows():
-            driver_number = driver['DriverNumber']
-            driver_name = driver['FullName']
-            team_name = driver['TeamName']
+        for driver in results.itertuples(index=False):
+            driver_number = driver.DriverNumber
+            driver_name = driver.FullName
+            team_name = driver.TeamName
             
             f.write(f"\nDRIVER: {driver_name} (#{driver_number})\n")
             f.write(f"Team: {team_name}\n")
             f.write("-" * 50 + "\n")
             
-            driver_laps = session.laps.pick_drivers(driver_number)
+            try:
+                driver_laps = laps_by_driver.get_group(driver_number)
+            except KeyError:
+                driver_laps = session.laps.iloc[:0]
             
             if not driver_laps.empty:
+                telemetry_by_lap = split_car_data_by_lap(session, driver_number, driver_laps)
+
                 # Overall performance summary
-                fastest_lap = driver_laps.pick_fastest()
-                avg_lap_time = driver_laps['LapTime'].mean()
+                if driver_number in lap_time_stats.index:
+                    fastest_lap_str = lap_time_stats.at[driver_number, 'min_str']
+                    fastest_lap_number = session.laps.at[lap_time_stats.at[driver_number, 'idxmin'], 'LapNumber']
+                    avg_lap_str = lap_time_stats.at[driver_number, 'mean_str']
+                else:
+                    fastest_lap_str, fastest_lap_number, avg_lap_str = "No time", None, "No time"
                 
                 f.write("\nPERFORMANCE SUMMARY:\n")
-                if fastest_lap is not None:
-                    f.write(f"Fastest Lap: Lap {fastest_lap['LapNumber']} - {format_timedelta(fastest_lap['LapTime'])}\n")
-                f.write(f"Average Lap Time: {format_timedelta(avg_lap_time)}\n")
+                if fastest_lap_number is not None:
+                    f.write(f"Fastest Lap: Lap {fastest_lap_number} - {fastest_lap_str}\n")
+                f.write(f"Average Lap Time: {avg_lap_str}\n")
                 
                 # Detailed lap-by-lap data
                 f.write("\nLAP-BY-LAP DETAILS:\n")
-                for _, lap in driver_laps.iterrows():
-                    if pd.notna(lap['LapTime']):
-                        f.write(f"\nLap {int(lap['LapNumber'])}:\n")
-                        f.write(f"  Time: {format_timedelta(lap['LapTime'])}\n")
-                        
-                        # Sector times
-                        if 'Sector1Time' in lap:
-                            f.write("  Sectors:\n")
-                            f.write(f"    S1: {format_timedelta(lap['Sector1Time'])}\n")
-                            f.write(f"    S2: {format_timedelta(lap['Sector2Time'])}\n")
-                            f.write(f"    S3: {format_timedelta(lap['Sector3Time'])}\n")
-                        
-                        # Speed data
-                        if 'SpeedI1' in lap:
-                            f.write("  Speed Traps (km/h):\n")
-                            f.write(f"    Trap 1: {lap['SpeedI1']:.1f}\n")
-                            f.write(f"    Trap 2: {lap['SpeedI2']:.1f}\n")
-                            f.write(f"    Trap 3: {lap['SpeedFL']:.1f}\n")
-                        
-                        # Tire information
-                        if 'Compound' in lap:
-                            f.write(f"  Tire Compound: {lap['Compound']}\n")
-                        
-                        # Lap validity
-                        if 'IsPersonalBest' in lap:
-                            f.write("  Lap Status:\n")
-                            f.write(f"    Personal Best: {'Yes' if lap['IsPersonalBest'] else 'No'}\n")
-                            if 'Invalid' in lap:
-                                f.write(f"    Valid Lap: {'No' if lap['Invalid'] else 'Yes'}\n")
+                # Laps without a time (e.g. aborted laps) are skipped before iterating
+                timed_driver_laps = driver_laps.dropna(subset=['LapTime'])
+                # Pull each column out once and walk them together instead of building a Series per lap
+                lap_columns = ['LapNumber', 'SpeedI1', 'SpeedI2', 'SpeedFL', 'IsPersonalBest', 'Invalid', 'Compound']
+                lap_values = [timed_driver_laps[col].tolist() if col in timed_driver_laps.columns else repeat(None)
+                              for col in lap_columns]
+                # Format all lap and sector times up front rather than once per lap
+                time_columns = ['LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time']
+                lap_values += [format_timedelta_series(timed_driver_laps[col]) if col in timed_driver_laps.columns
+                               else repeat("No time") for col in time_columns]
+                # Collect the lap block and hand it to the buffer in one call per driver
+                lap_lines = []
+                for (lap_number, speed_i1, speed_i2, speed_fl, personal_best, invalid,
+                     compound, lap_time_str, s1, s2, s3) in zip(*lap_values):
+                    lap_lines.append(f"\nLap {int(lap_number)}:\n")
+                    lap_lines.append(f"  Time: {lap_time_str}\n")
+                    
+                    # Sector times
+                    if has_sectors:
+                        lap_lines.append("  Sectors:\n")
+                        lap_lines.append(f"    S1: {s1}\n")
+                        lap_lines.append(f"    S2: {s2}\n")
+                        lap_lines.append(f"    S3: {s3}\n")
+                    
+                    # Speed data
+                    if has_speed_traps:
+                        lap_lines.append("  Speed Traps (km/h):\n")
+                        lap_lines.append(f"    Trap 1: {speed_i1:.1f}\n")
+                        lap_lines.append(f"    Trap 2: {speed_i2:.1f}\n")
+                        lap_lines.append(f"    Trap 3: {speed_fl:.1f}\n")
+                    
+                    # Tire information
+                    if has_compound:
+                        lap_lines.append(f"  Tire Compound: {compound}\n")
+                    
+                    # Lap validity
+                    if has_personal_best:
+                        lap_lines.append("  Lap Status:\n")
+                        lap_lines.append(f"    Personal Best: {'Yes' if personal_best else 'No'}\n")
+                        if has_invalid:
+                            lap_lines.append(f"    Valid Lap: {'No' if invalid else 'Yes'}\n")
 
-                        # Additional telemetry statistics (if available)
-                        telemetry = lap.get_telemetry()
-                        if not telemetry.empty:
-                            max_speed = telemetry['Speed'].max()
-                            avg_speed = telemetry['Speed'].mean()
-                            f.write("  Telemetry Stats:\n")
-                            f.write(f"    Max Speed: {max_speed:.1f} km/h\n")
-                            f.write(f"    Avg Speed: {avg_speed:.1f} km/h\n")
-                            if 'Throttle' in telemetry:
-                                # Calculate throttle usage statistics
-                                throttle_samples = telemetry['Throttle'].values
-                                full_throttle = (throttle_samples >= 95).mean() * 100  # >= 95% throttle
-                                partial_throttle = ((throttle_samples > 5) & (throttle_samples < 95)).mean() * 100  # Between 5% and 95%
-                                no_throttle = (throttle_samples <= 5).mean() * 100  # <= 5% throttle
-                                
-                                f.write(f"    Throttle Usage Stats:\n")
-                                f.write(f"      - Full Throttle (≥95%): {full_throttle:.1f}% of lap\n")
-                                f.write(f"      - Partial Throttle (5-95%): {partial_throttle:.1f}% of lap\n")
-                                f.write(f"      - No Throttle (≤5%): {no_throttle:.1f}% of lap\n")
-                                f.write(f"      - Average Throttle: {throttle_samples.mean():.1f}%\n")
+                    # Additional telemetry statistics (if available)
+                    telemetry = telemetry_by_lap.get(lap_number)
+                    if telemetry is not None:
+                        # Reduce the raw arrays directly rather than through pandas' reduction machinery
+                        speed_samples = telemetry['Speed'].to_numpy()
+                        max_speed, avg_speed = speed_samples.max(), speed_samples.mean()
+                        lap_lines.append("  Telemetry Stats:\n")
+                        lap_lines.append(f"    Max Speed: {max_speed:.1f} km/h\n")
+                        lap_lines.append(f"    Avg Speed: {avg_speed:.1f} km/h\n")
+                        if 'Throttle' in telemetry:
+                            # Calculate throttle usage statistics
+                            throttle_samples = telemetry['Throttle'].to_numpy()
+                            # Bucket samples into no (<=5%), partial (5-95%) and full (>=95%) throttle in one pass
+                            throttle_bands = np.digitize(throttle_samples, [np.nextafter(5, np.inf), 95])
+                            no_throttle, partial_throttle, full_throttle = (
+                                np.bincount(throttle_bands, minlength=3) / throttle_samples.size * 100
+                            )
+                            
+                            lap_lines.append(f"    Throttle Usage Stats:\n")
+                            lap_lines.append(f"      - Full Throttle (≥95%): {full_throttle:.1f}% of lap\n")
+                            lap_lines.append(f"      - Partial Throttle (5-95%): {partial_throttle:.1f}% of lap\n")
+                            lap_lines.append(f"      - No Throttle (≤5%): {no_throttle:.1f}% of lap\n")
+                            lap_lines.append(f"      - Average Throttle: {throttle_samples.mean():.1f}%\n")
 
-                            if 'Brake' in telemetry:
-                                # Calculate brake usage statistics
-                                brake_samples = telemetry['Brake'].values
-                                brake_usage_percent = (brake_samples > 0).mean() * 100
-                                brake_duration = len(brake_samples[brake_samples > 0])
-                                total_samples = len(brake_samples)
-                                
-                                f.write(f"    Brake Usage Stats:\n")
-                                f.write(f"      - Time on Brakes: {brake_usage_percent:.1f}% of lap\n")
-                                f.write(f"      - Brake Applications: {brake_duration} out of {total_samples} samples\n")
-                                
-                                # Calculate brake zones (where brake > 0 for consecutive samples)
-                                brake_zones = 0
-                                in_brake_zone = False
-                                for brake_val in brake_samples:
-                                    if brake_val > 0 and not in_brake_zone:
-                                        brake_zones += 1
-                                        in_brake_zone = True
-                                    elif brake_val == 0:
-                                        in_brake_zone = False
-                                
-                                f.write(f"      - Distinct Brake Zones: {brake_zones}\n")
+                        if 'Brake' in telemetry:
+                            # Calculate brake usage statistics
+                            brake_samples = telemetry['Brake'].to_numpy()
+                            braking = brake_samples > 0
+                            brake_duration = int(np.count_nonzero(braking))
+                            total_samples = braking.size
+                            brake_usage_percent = brake_duration / total_samples * 100
+                            
+                            lap_lines.append(f"    Brake Usage Stats:\n")
+                            lap_lines.append(f"      - Time on Brakes: {brake_usage_percent:.1f}% of lap\n")
+                            lap_lines.append(f"      - Brake Applications: {brake_duration} out of {total_samples} samples\n")
+                            
+                            # Calculate brake zones (rising edges where braking starts)
+                            brake_zones = int(np.count_nonzero(braking[1:] & ~braking[:-1])) + int(braking[0])
+                            
+                            lap_lines.append(f"      - Distinct Brake Zones: {brake_zones}\n")
+                f.writelines(lap_lines)
 
             f.write("\n" + "=" * 50 + "\n")
 
         # Session Overview for LLM
-        f.write("\nSESSION OVERVIEW FOR LLM ANALYSIS\n")
-        f.write("================================\n")
+        f.write("\n" + section("SESSION OVERVIEW FOR LLM ANALYSIS"))
         f.write("Key Statistics and Insights:\n")
         
-        # Overall session statistics
-        total_laps = len(session.laps)
-        completed_laps = len(session.laps[pd.notna(session.laps['LapTime'])])
-        
+        # Overall session statistics (lap counts computed for SESSION STATISTICS above)
         f.write(f"\n1. Session Completion:\n")
         f.write(f"   - Total Laps: {total_laps}\n")
         f.write(f"   - Completed Laps: {completed_laps}\n")
@@ -295,17 +344,25 @@ def extract_race_data(year, event, session_type="Race", description=None):
         f.write(f"Analysis generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         f.write(f"Data source: FastF1 {fastf1.__version__}\n")
         f.write(f"{'='*50}\n")
+
+        # Report is assembled in memory and flushed to disk in a single write
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as out:
+            out.write(f.getvalue())
     
-    script_logger.info(f"✅ Data extraction complete. File saved as: {filename}")
+    script_logger.info("✅ Data extraction complete. File saved as: %s", filename)
     return filename
 
 if __name__ == "__main__":
     script_logger.info("🚦 Starting race data extraction for multiple races...")
     
-    for race_name, description in RACE_DESCRIPTIONS.items():
-        script_logger.info(f"Processing {race_name} Grand Prix...")
-        output_file = extract_race_data(2024, race_name, "Race", description)
-        script_logger.info(f"Completed {race_name} Grand Prix: {output_file}")
+    # Races are independent, so extract them in parallel worker processes
+    with ProcessPoolExecutor(max_workers=min(8, len(RACE_DESCRIPTIONS))) as executor:
+        futures = {}
+        for race_name, description in RACE_DESCRIPTIONS.items():
+            script_logger.info("Processing %s Grand Prix...", race_name)
+            futures[executor.submit(extract_race_data, 2024, race_name, "Race", description)] = race_name
+        for future in as_completed(futures):
+            script_logger.info("Completed %s Grand Prix: %s", futures[future], future.result())
     
     script_logger.info("🏁 All races processed successfully!")
 
@@ -1,13 +1,23 @@
 import fastf1
+import io
+import os
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
 import warnings
 import numpy as np
 import logging
+import multiprocessing
+import sys
 
 # Set FastF1 logging level first
 fastf1.set_log_level('CRITICAL')
 
+# Enable FastF1 cache once per process, creating the directory if it doesn't exist yet
+os.makedirs('cache', exist_ok=True)
+fastf1.Cache.enable_cache('cache')
+
 # Set up logging for our script only
 script_logger = logging.getLogger('f1_data_extractor')
 script_logger.setLevel(logging.INFO)
@@ -23,149 +33,304 @@ script_logger.addHandler(console_handler)
 # Ignore all warnings
 warnings.filterwarnings('ignore')
 
-def format_timedelta(td):
-    """Format timedelta to readable string."""
-    if pd.isna(td):
-        return "No time"
-    total_seconds = td.total_seconds()
-    minutes = int(total_seconds // 60)
+# Number of quickest laps per driver that get full telemetry by default
+TELEMETRY_FASTEST_LAPS = 3
+
+# Telemetry channels exported to Parquet, with the narrowest dtype that holds each one
+PARQUET_CHANNELS = {
+    'Distance': 'float32',
+    'Speed': 'float32',
+    'Throttle': 'float32',
+    'Brake': 'int8',
+    'nGear': 'int8',
+    'RPM': 'float32',
+    'DRS': 'int8',
+}
+
+# Upper bound on driver worker processes; each driver only decodes a few laps of telemetry,
+# so more workers mostly add start-up cost
+MAX_DRIVER_WORKERS = 4
+
+# Session data used by driver workers, filled in by the parent before the pool forks
+_worker_state = {}
+
+def section(title):
+    """Return a section header: the title underlined with '=' to its full length."""
+    return f"{title}\n{'=' * len(title)}\n"
+
+def format_timedelta_series(series):
+    """Format a timedelta Series to readable strings in a single vectorized pass."""
+    total_seconds = series.dt.total_seconds().to_numpy()
+    valid = ~np.isnan(total_seconds)
+    total_seconds = np.where(valid, total_seconds, 0.0)
+    minutes = (total_seconds // 60).astype(int)
     seconds = total_seconds % 60
-    return f"{minutes:01d}:{seconds:06.3f}"
+    formatted = np.char.add(np.char.add(minutes.astype(str), ':'), np.char.mod('%06.3f', seconds))
+    return np.where(valid, formatted, "No time")
 
-def format_telemetry_data(telemetry):
-    """Format telemetry data into a condensed, readable format."""
+def format_telemetry_data(telemetry, target_n=100):
+    """Format telemetry data into condensed, readable lines, downsampled to at most target_n points."""
     if telemetry.empty:
-        return "No telemetry data"
-    
-    data = {
-        'Distance': telemetry['Distance'].values,
-        'Speed': telemetry['Speed'].values,
-        'Throttle': telemetry['Throttle'].values if 'Throttle' in telemetry else None,
-        'Brake': telemetry['Brake'].values if 'Brake' in telemetry else None,
-        'Gear': telemetry['nGear'].values if 'nGear' in telemetry else None,
-        'RPM': telemetry['RPM'].values if 'RPM' in telemetry else None,
-        'DRS': telemetry['DRS'].values if 'DRS' in telemetry else None
-    }
-    
-    # Create a list of telemetry points
-    points = []
-    for i in range(len(data['Distance'])):
-        point = {
-            'D': f"{data['Distance'][i]:.0f}m",
-            'S': f"{data['Speed'][i]:.0f}",
-        }
-        if data['Throttle'] is not None:
-            point['T'] = f"{data['Throttle'][i]:.0f}"
-        if data['Brake'] is not None:
-            point['B'] = '1' if data['Brake'][i] > 0 else '0'
-        if data['Gear'] is not None:
-            point['G'] = f"{int(data['Gear'][i])}"
-        if data['RPM'] is not None:
-            point['R'] = f"{data['RPM'][i]:.0f}"
-        if data['DRS'] is not None:
-            point['DRS'] = '1' if data['DRS'][i] > 0 else '0'
-        points.append(point)
-    
-    return points
-
-def extract_race_data(year, event, session_type="Race"):
-    """Extract comprehensive race data in LLM-friendly format."""
-    
-    script_logger.info(f"🏎️ Starting data extraction for {event} {year} - {session_type}")
-    
-    fastf1.Cache.enable_cache('cache')
+        return []
+    
+    # Evenly spaced samples are plenty for a text summary of the lap
+    if target_n and len(telemetry) > target_n:
+        telemetry = telemetry.iloc[np.linspace(0, len(telemetry) - 1, target_n).astype(int)]
+    
+    # Gear and DRS are small integer channels, so narrow them from float64 before formatting
+    int_channels = {column: 'int8' for column in ('nGear', 'DRS') if column in telemetry}
+    if int_channels:
+        telemetry = telemetry.astype(int_channels)
+    
+    # Format each channel column-wise, then stitch the columns together per sample
+    columns = [
+        np.char.mod('D:%.0fm', telemetry['Distance'].to_numpy()),
+        np.char.mod('S:%.0f', telemetry['Speed'].to_numpy()),
+    ]
+    if 'Throttle' in telemetry:
+        columns.append(np.char.mod('T:%.0f', telemetry['Throttle'].to_numpy()))
+    if 'Brake' in telemetry:
+        columns.append(np.where(telemetry['Brake'].to_numpy() > 0, 'B:1', 'B:0'))
+    if 'nGear' in telemetry:
+        columns.append(np.char.mod('G:%d', telemetry['nGear'].to_numpy()))
+    if 'RPM' in telemetry:
+        columns.append(np.char.mod('R:%.0f', telemetry['RPM'].to_numpy()))
+    if 'DRS' in telemetry:
+        columns.append(np.where(telemetry['DRS'].to_numpy() > 0, 'DRS:1', 'DRS:0'))
+    
+    points = columns[0]
+    for column in columns[1:]:
+        points = np.char.add(np.char.add(points, ' | '), column)
+    
+    return points.tolist()
+
+def lap_stats(speed, throttle, brake):
+    """Compute (max speed, avg speed, avg throttle, brake use %) from raw telemetry arrays."""
+    return speed.max(), speed.mean(), throttle.mean(), np.count_nonzero(brake > 0) / brake.size * 100
+
+def _map_drivers(func, *iterables):
+    """Map func over drivers in forked workers that inherit _worker_state on Linux, or serially elsewhere."""
+    # Fork is only safe by default on Linux; macOS defaults to spawn because forking after
+    # system frameworks are loaded can crash, and spawned workers would have to reload the session
+    if not sys.platform.startswith('linux'):
+        return list(map(func, *iterables))
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(MAX_DRIVER_WORKERS, os.cpu_count() or 1)),
+        mp_context=multiprocessing.get_context('fork')
+    ) as executor:
+        # map() yields results in submission order, so callers keep the classification order
+        return list(executor.map(func, *iterables))
+
+def _prepare_driver_state(session):
+    """Fill _worker_state from the already loaded session, before any driver workers start."""
+    _worker_state['session'] = session
+    # Partition laps by driver once instead of scanning all laps for every driver
+    _worker_state['laps_by_driver'] = session.laps.groupby('DriverNumber', sort=False)
+    # Per-driver fastest and average lap times from one grouped reduction
+    timed_laps = session.laps.dropna(subset=['LapTime'])
+    lap_time_stats = timed_laps.groupby('DriverNumber')['LapTime'].agg(['min', 'idxmin', 'mean'])
+    # Format every driver's fastest and average lap time in one vectorized pass
+    lap_time_stats['min_str'] = format_timedelta_series(lap_time_stats['min'])
+    lap_time_stats['mean_str'] = format_timedelta_series(lap_time_stats['mean'])
+    _worker_state['lap_time_stats'] = lap_time_stats
+    # Optional lap columns are part of the schema, so check for them once up front
+    _worker_state['has_sectors'] = 'Sector1Time' in session.laps.columns
+
+def _prepare_telemetry_state(session):
+    """Fill _worker_state with just the per-driver lap groups the Parquet export reads."""
+    _worker_state['laps_by_driver'] = session.laps.groupby('DriverNumber', sort=False)
+
+def select_telemetry_positions(timed_driver_laps, telemetry_laps):
+    """Return the positions within a driver's timed laps that get full telemetry."""
+    if telemetry_laps == "all":
+        return range(len(timed_driver_laps))
+    fastest_order = np.argsort(timed_driver_laps['LapTime'].to_numpy())
+    return set(fastest_order[:TELEMETRY_FASTEST_LAPS].tolist())
+
+def build_driver_block(driver_number, driver_name, team_name, telemetry_laps):
+    """Build one driver's lap analysis text block inside a worker process."""
+    session = _worker_state['session']
+    lap_time_stats = _worker_state['lap_time_stats']
+    has_sectors = _worker_state['has_sectors']
+    
+    driver_lines = [f"\n{driver_name} (#{driver_number}, {team_name})\n", "-" * 40 + "\n"]
+    
+    try:
+        driver_laps = _worker_state['laps_by_driver'].get_group(driver_number)
+    except KeyError:
+        driver_laps = session.laps.iloc[:0]
+    
+    if not driver_laps.empty:
+        # Overall performance summary
+        if driver_number in lap_time_stats.index:
+            fastest_lap_str = lap_time_stats.at[driver_number, 'min_str']
+            fastest_lap_number = session.laps.at[lap_time_stats.at[driver_number, 'idxmin'], 'LapNumber']
+            lap_suffix = f" (L{fastest_lap_number})"
+            avg_lap_str = lap_time_stats.at[driver_number, 'mean_str']
+        else:
+            # No timed lap, so there is no fastest lap number to show
+            fastest_lap_str, lap_suffix, avg_lap_str = "No time", "", "No time"
+        
+        # Performance Summary (one line)
+        driver_lines.append(f"Best: {fastest_lap_str}{lap_suffix} | Avg: {avg_lap_str}\n")
+        
+        # Laps without a time (e.g. aborted laps) are skipped before iterating
+        timed_driver_laps = driver_laps.dropna(subset=['LapTime'])
+        # Format lap numbers and all lap/sector times column-wise rather than once per lap
+        lap_numbers = timed_driver_laps['LapNumber'].astype(int)
+        lap_time_strs = format_timedelta_series(timed_driver_laps['LapTime'])
+        sector_strs = [format_timedelta_series(timed_driver_laps[col]) if col in timed_driver_laps.columns
+                       else np.full(len(timed_driver_laps), "N/A")
+                       for col in ('Sector1Time', 'Sector2Time', 'Sector3Time')]
+        
+        # Lap Details (condensed format)
+        driver_lines.append("Lap Data: [Lap#] Time | S1 | S2 | S3\n")
+        lap_table = ("[" + lap_numbers.astype(str).str.rjust(2) + "] " + lap_time_strs
+                     + " | " + sector_strs[0] + " | " + sector_strs[1] + " | " + sector_strs[2] + "\n")
+        driver_lines.append("".join(lap_table))
+
+        # Lap Details with full telemetry; decoding telemetry is by far the most expensive
+        # step, so by default only each driver's quickest laps are included
+        telemetry_positions = select_telemetry_positions(timed_driver_laps, telemetry_laps)
+        if telemetry_laps == "all":
+            driver_lines.append("\nLAP-BY-LAP DETAILS WITH TELEMETRY:\n")
+        else:
+            driver_lines.append(f"\nLAP-BY-LAP DETAILS WITH TELEMETRY (fastest {TELEMETRY_FASTEST_LAPS} laps):\n")
+        driver_lines.append("Format: D=Distance(m), S=Speed(km/h), T=Throttle(%), B=Brake(0/1), G=Gear, R=RPM, DRS(0/1)\n")
+        
+        for lap_idx, (lap_num, lap_time_str, s1, s2, s3) in enumerate(
+                zip(lap_numbers.tolist(), lap_time_strs, *sector_strs)):
+            if lap_idx not in telemetry_positions:
+                continue
+            
+            # Basic lap information
+            driver_lines.append(f"\n[Lap {lap_num}] Time: {lap_time_str}\n")
+            
+            # Sector times
+            if has_sectors:
+                driver_lines.append(f"Sectors: S1={s1} | S2={s2} | S3={s3}\n")
+            
+            # Full telemetry data
+            telemetry = timed_driver_laps.iloc[lap_idx].get_telemetry()
+            if not telemetry.empty:
+                driver_lines.append("Telemetry Points:\n")
+                driver_lines.append("\n".join(format_telemetry_data(telemetry)) + "\n")
+                
+                # Lap statistics
+                if 'Throttle' in telemetry and 'Brake' in telemetry:
+                    max_speed, avg_speed, avg_throttle, brake_usage = lap_stats(
+                        telemetry['Speed'].to_numpy(),
+                        telemetry['Throttle'].to_numpy(),
+                        telemetry['Brake'].to_numpy()
+                    )
+                    driver_lines.append(f"Stats: MaxSpd={max_speed:.0f} | AvgSpd={avg_speed:.0f} | AvgThrottle={avg_throttle:.0f}% | BrakeUse={brake_usage:.0f}%\n")
+            
+            driver_lines.append("-" * 40 + "\n")
+    
+    return "".join(driver_lines)
+
+def build_driver_telemetry_frame(driver_number, telemetry_laps):
+    """Collect one driver's selected lap telemetry as a compact columnar frame inside a worker process."""
+    try:
+        driver_laps = _worker_state['laps_by_driver'].get_group(driver_number)
+    except KeyError:
+        return None
+    
+    timed_driver_laps = driver_laps.dropna(subset=['LapTime'])
+    lap_frames = []
+    for lap_idx in sorted(select_telemetry_positions(timed_driver_laps, telemetry_laps)):
+        lap = timed_driver_laps.iloc[lap_idx]
+        telemetry = lap.get_telemetry()
+        if telemetry.empty:
+            continue
+        channels = {column: dtype for column, dtype in PARQUET_CHANNELS.items() if column in telemetry}
+        lap_frame = telemetry[list(channels)].astype(channels)
+        lap_frame.insert(0, 'LapNumber', np.int16(lap['LapNumber']))
+        lap_frames.append(lap_frame)
+    
+    if not lap_frames:
+        return None
+    driver_frame = pd.concat(lap_frames, ignore_index=True)
+    driver_frame.insert(0, 'Driver', driver_number)
+    return driver_frame
+
+def extract_telemetry_parquet(year, event, session_type="Race", telemetry_laps="fastest"):
+    """Export the selected laps' telemetry for every driver to a zstd-compressed Parquet file."""
+    script_logger.info("🏎️ Starting telemetry export for %s %s - %s", event, year, session_type)
+    
+    session = fastf1.get_session(year, event, session_type)
+    session.load()
+    
+    filename = f"race_data_{event}_{year}_{session_type}_telemetry.parquet"
+    results = session.results
+    # Forked workers share the session loaded above; the export only needs the lap groups
+    _prepare_telemetry_state(session)
+    try:
+        driver_frames = [frame for frame in _map_drivers(
+            build_driver_telemetry_frame, results['DriverNumber'], repeat(telemetry_laps)
+        ) if frame is not None]
+    finally:
+        # Don't keep this session's data alive (or leak it into the next run) once workers finish
+        _worker_state.clear()
+    
+    if not driver_frames:
+        raise ValueError(f"No telemetry available for {event} {year} - {session_type}")
+    telemetry = pd.concat(driver_frames, ignore_index=True)
+    telemetry['Driver'] = telemetry['Driver'].astype('category')
+    telemetry.to_parquet(filename, compression='zstd', index=False)
+    
+    script_logger.info("✅ Telemetry export complete. File saved as: %s", filename)
+    return filename
+
+def extract_race_data(year, event, session_type="Race", telemetry_laps="fastest", fmt="txt"):
+    """Extract comprehensive race data in LLM-friendly format.
+
+    telemetry_laps selects which laps get full telemetry: "fastest" (each driver's
+    TELEMETRY_FASTEST_LAPS quickest laps) or "all".
+    fmt="txt" writes the human/LLM-readable report; fmt="parquet" writes only the
+    telemetry as a compressed columnar file for downstream tooling.
+    """
+    if telemetry_laps not in ("fastest", "all"):
+        raise ValueError(f"telemetry_laps must be 'fastest' or 'all', got {telemetry_laps!r}")
+    if fmt not in ("txt", "parquet"):
+        raise ValueError(f"fmt must be 'txt' or 'parquet', got {fmt!r}")
+    if fmt == "parquet":
+        return extract_telemetry_parquet(year, event, session_type, telemetry_laps)
+    
+    script_logger.info("🏎️ Starting data extraction for %s %s - %s", event, year, session_type)
+    
     session = fastf1.get_session(year, event, session_type)
     session.load()
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"race_data_{event}_{year}_{session_type}_large.txt"
     
-    with open(filename, 'w', encoding='utf-8') as f:
+    with io.StringIO() as f:
         # Event Summary with clear structure
-        f.write("EVENT SUMMARY\n")
-        f.write("=============\n")
+        f.write(section("EVENT SUMMARY"))
         f.write(f"GP: {session.event.EventName} | Year: {year} | Session: {session_type}\n")
         f.write(f"Date: {session.date.strftime('%Y-%m-%d')} | Track: {event} | Country: {session.event.Country}\n\n")
 
         # Detailed lap-by-lap analysis for each driver
-        f.write("DRIVER LAP ANALYSIS\n")
-        f.write("===================\n")
+        f.write(section("DRIVER LAP ANALYSIS"))
         results = session.results
-
-        for _, driver in results.iterrows():
-            driver_number = driver['DriverNumber']
-            driver_name = driver['FullName']
-            team_name = driver['TeamName']
-            
-            f.write(f"\n{driver_name} (#{driver_number}, {team_name})\n")
-            f.write("-" * 40 + "\n")
-            
-            driver_laps = session.laps.pick_drivers(driver_number)
-            
-            if not driver_laps.empty:
-                # Overall performance summary
-                fastest_lap = driver_laps.pick_fastest()
-                avg_lap_time = driver_laps['LapTime'].mean()
-                
-                # Performance Summary (one line)
-                f.write(f"Best: {format_timedelta(fastest_lap['LapTime'])} (L{fastest_lap['LapNumber']}) | Avg: {format_timedelta(avg_lap_time)}\n")
-                
-                # Lap Details (condensed format)
-                f.write("Lap Data: [Lap#] Time | S1 | S2 | S3\n")
-                for _, lap in driver_laps.iterrows():
-                    if pd.notna(lap['LapTime']):
-                        lap_num = int(lap['LapNumber'])
-                        lap_time = format_timedelta(lap['LapTime'])
-                        s1 = format_timedelta(lap['Sector1Time']) if 'Sector1Time' in lap else "N/A"
-                        s2 = format_timedelta(lap['Sector2Time']) if 'Sector2Time' in lap else "N/A"
-                        s3 = format_timedelta(lap['Sector3Time']) if 'Sector3Time' in lap else "N/A"
-                        
-                        # Condensed lap information
-                        f.write(f"[{lap_num:2d}] {lap_time} | {s1} | {s2} | {s3}\n")
-
-                # Lap Details with full telemetry
-                f.write("\nLAP-BY-LAP DETAILS WITH TELEMETRY:\n")
-                f.write("Format: D=Distance(m), S=Speed(km/h), T=Throttle(%), B=Brake(0/1), G=Gear, R=RPM, DRS(0/1)\n")
-                
-                for _, lap in driver_laps.iterrows():
-                    if pd.notna(lap['LapTime']):
-                        lap_num = int(lap['LapNumber'])
-                        lap_time = format_timedelta(lap['LapTime'])
-                        
-                        # Basic lap information
-                        f.write(f"\n[Lap {lap_num}] Time: {lap_time}\n")
-                        
-                        # Sector times
-                        if 'Sector1Time' in lap:
-                            s1 = format_timedelta(lap['Sector1Time'])
-                            s2 = format_timedelta(lap['Sector2Time'])
-                            s3 = format_timedelta(lap['Sector3Time'])
-                            f.write(f"Sectors: S1={s1} | S2={s2} | S3={s3}\n")
-                        
-                        # Full telemetry data
-                        telemetry = lap.get_telemetry()
-                        if not telemetry.empty:
-                            telemetry_points = format_telemetry_data(telemetry)
-                            f.write("Telemetry Points:\n")
-                            for point in telemetry_points:
-                                point_str = " | ".join([f"{k}:{v}" for k, v in point.items()])
-                                f.write(f"{point_str}\n")
-                            
-                            # Lap statistics
-                            max_speed = telemetry['Speed'].max()
-                            avg_speed = telemetry['Speed'].mean()
-                            if 'Throttle' in telemetry and 'Brake' in telemetry:
-                                avg_throttle = telemetry['Throttle'].mean()
-                                brake_usage = (telemetry['Brake'] > 0).mean() * 100
-                                f.write(f"Stats: MaxSpd={max_speed:.0f} | AvgSpd={avg_speed:.0f} | AvgThrottle={avg_throttle:.0f}% | BrakeUse={brake_usage:.0f}%\n")
-                        
-                        f.write("-" * 40 + "\n")
+        # Drivers are independent, so build their blocks in parallel worker processes
+        # forked from this one; they inherit the session loaded above instead of reloading it
+        _prepare_driver_state(session)
+        try:
+            f.writelines(_map_drivers(
+                build_driver_block,
+                results['DriverNumber'], results['FullName'], results['TeamName'],
+                repeat(telemetry_laps)
+            ))
+        finally:
+            # Don't keep this session's data alive (or leak it into the next run) once workers finish
+            _worker_state.clear()
 
         # Session Overview for LLM
-        f.write("\nSESSION SUMMARY\n")
-        f.write("===============\n")
-        total_laps = len(session.laps)
-        completed_laps = len(session.laps[pd.notna(session.laps['LapTime'])])
+        f.write("\n" + section("SESSION SUMMARY"))
+        total_laps = len(session.laps.index)
+        completed_laps = int(session.laps['LapTime'].count())
         
         f.write(f"Completion: {completed_laps}/{total_laps} laps ({(completed_laps/total_laps*100):.1f}%)\n")
         if 'AirTemp' in session.laps:
@@ -175,8 +340,12 @@ def extract_race_data(year, event, session_type="Race"):
         f.write(f"\n{'='*50}\n")
         f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | FastF1 {fastf1.__version__}\n")
         f.write(f"{'='*50}\n")
+
+        # Report is assembled in memory and flushed to disk in a single write
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as out:
+            out.write(f.getvalue())
     
-    script_logger.info(f"✅ Data extraction complete. File saved as: {filename}")
+    script_logger.info("✅ Data extraction complete. File saved as: %s", filename)
     return filename
 
 if __name__ == "__main__":
@@ -185,4 +354,4 @@ if __name__ == "__main__":
         output_file = extract_race_data(2024, "Bahrain", "Race")
         script_logger.info("🏁 Script completed successfully!")
     except Exception as e:
-        script_logger.error(f"❌ Error during execution: {e}")
+        script_logger.error("❌ Error during execution: %s", e)
@@ -1,16 +1,28 @@
 import fastf1
+import functools
+import os
+import threading
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 import fastf1.plotting
 
-# Enable FastF1 cache
-fastf1.Cache.enable_cache('cache')
+# Enable FastF1 cache; FASTF1_CACHE overrides the location (e.g. a RAM-backed /dev/shm path
+# with enough room for the cached sessions), otherwise share ./cache with the extractor scripts
+CACHE_DIR = os.environ.get('FASTF1_CACHE') or 'cache'
+os.makedirs(CACHE_DIR, exist_ok=True)
+fastf1.Cache.enable_cache(CACHE_DIR)
 
-# Streamlit App Title
-st.title("🏎️ F1 Visualizer")
+# Seasons offered in the year picker
+AVAILABLE_YEARS = list(range(2019, 2025))
 
-st.markdown("""
+# Spacing (in meters) of the distance grid speed traces are resampled onto
+TELEMETRY_STEP_M = 5.0
+
+# Page styles. Streamlit drops any element a rerun doesn't emit again, so these have to be
+# sent on every rerun rather than once per browser session
+APP_CSS = """
     <style>
         .button .stButton, .stDownloadButton {
             display: flex;
@@ -45,99 +57,167 @@ st.markdown("""
             }
         }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Credits shown under the charts, sent as a single markdown element
+FOOTER_HTML = """
+    <div style="text-align: center; font-size: 16px; padding-top: 10px; margin-top: 25px;">
+        🔹 Data powered by FastF1. 🚀
+    </div>
+    <div style="color: #28282B; font-size: 1.0em; display: flex; justify-content: center; align-items: center; margin: auto; background-color: #F4EBD0; height: 21px; min-width: 8em; max-width: 12.6em; margin-top: 25px;">
+        Made by Trevor Waite
+    </div>
+"""
+
+# Streamlit App Title
+st.title("🏎️ F1 Visualizer")
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# Each cached session pins its laps and telemetry in memory, so only keep the most recent few
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _get_loaded_session(year, event, session_type):
+    """Load a session once per (year, event, session_type) and share it across reruns and users."""
+    session = fastf1.get_session(year, event, session_type)
+    session.load()
+    return session
+
+@st.cache_resource(show_spinner=False)
+def _prewarm_sessions(prewarm_events):
+    """Load the "year:event:session" entries of PREWARM_EVENTS in a background thread, once per process."""
+    events = []
+    for entry in prewarm_events.split(','):
+        parts = entry.strip().split(':')
+        # Skip blank entries (e.g. a trailing comma) and anything not shaped year:event:session
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue
+        year, event, session_type = parts
+        events.append((int(year), event, session_type))
+
+    def warm():
+        for year, event, session_type in events:
+            try:
+                _get_loaded_session(year, event, session_type)
+            except Exception:
+                # A bad entry shouldn't stop the rest from warming; users will see the error on load
+                continue
+
+    thread = threading.Thread(target=warm, name='fastf1-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_data(show_spinner=False)
+def _get_driver_number_name_map(year, event, session_type):
+    """Map driver numbers to full names for a session."""
+    session = _get_loaded_session(year, event, session_type)
+    # One pass over the results table instead of a get_driver() row lookup per driver
+    results = session.results
+    return dict(zip(results['DriverNumber'].astype(str), results['FullName']))
+
+@functools.lru_cache(maxsize=128)
+def _team_color(team_name):
+    """Look up a team's plot color once per team for the life of the app."""
+    return fastf1.plotting.team_color(team_name)
+
+@st.cache_data(show_spinner=False)
+def _best_times(year, event, session_type):
+    """Each driver's formatted best lap time for a session as (number, time) pairs, fastest first."""
+    session = _get_loaded_session(year, event, session_type)
+    laps = session.laps.dropna(subset=['LapTime'])
+    best = laps.groupby('DriverNumber')['LapTime'].min().sort_values()
+    # Plain strings keep the cached value cheap to hash and copy on every hit
+    return list(zip(best.index.tolist(), format_lap_times(best).tolist()))
 
 def initialize_session_state():
     """Initialize session state variables if they don't exist."""
     if 'hide_visi_buton' not in st.session_state:
         st.session_state.hide_visi_buton = False
-    if 'last_selections' not in st.session_state:
-        st.session_state.last_selections = {'year': None, 'event': None, 'session_type': None}
+    if 'last_selections_key' not in st.session_state:
+        st.session_state.last_selections_key = (None, None, None)
     if 'data_loaded' not in st.session_state:
         st.session_state.data_loaded = False
 
 def check_input_changes(year, event, session_type):
     """Check if any input has changed from last loaded data."""
-    last = st.session_state.last_selections
-    if year != last['year'] or event != last['event'] or session_type != last['session_type']:
-        st.session_state.hide_visi_buton = True
+    changed = (year, event, session_type) != st.session_state.last_selections_key
+    st.session_state.hide_visi_buton = changed
+    if changed:
         st.session_state.data_loaded = False
-    else:
-        st.session_state.hide_visi_buton = False
 
 def load_session_data(year, event, session_type):
     """Load session data and update session state."""
     with st.spinner(f"Fetching {session_type} data... ⏳ This may take a minute."):
         try:
-            session = fastf1.get_session(year, event, session_type)
-            session.load()
-            driver_number_name_map = {num: session.get_driver(num)['FullName'] for num in session.drivers}
+            driver_number_name_map = _get_driver_number_name_map(year, event, session_type)
             st.session_state.driver_number_name_map = driver_number_name_map
-            st.session_state.last_selections = {'year': year, 'event': event, 'session_type': session_type}
+            # Reverse lookup so selected names map straight to driver numbers
+            st.session_state.driver_name_number_map = {name: num for num, name in driver_number_name_map.items()}
+            st.session_state.last_selections_key = (year, event, session_type)
             st.session_state.data_loaded = True
             st.session_state.hide_visi_buton = False
             st.success(f"Data loaded successfully for {event} {year} - {session_type}")
         except Exception as e:
             st.error(f"Failed to load data: {e}")
 
-def display_driver_positions(session, session_type, selected_driver_names, selected_driver_numbers):
+def format_lap_times(series):
+    """Format a Series of lap timedeltas as M:SS.sss strings in one vectorized pass, None where missing."""
+    valid = series.notna().to_numpy()
+    total_ms = np.where(valid, series.to_numpy(dtype='timedelta64[ms]').view('int64'), 0)
+    minutes, remainder_ms = np.divmod(total_ms, 60_000)
+    seconds, ms = np.divmod(remainder_ms, 1000)
+    formatted = np.char.add(np.char.add(np.char.mod('%d:', minutes), np.char.mod('%02d.', seconds)),
+                            np.char.mod('%03d', ms))
+    return np.where(valid, formatted, None)
+
+def _fmt_lap(td):
+    """Format a single lap timedelta as M:SS.sss, matching format_lap_times."""
+    return format_lap_times(pd.Series([td], dtype='timedelta64[ns]'))[0]
+
+def display_driver_positions(session, year, event, session_type, selected_driver_names, selected_driver_numbers):
     """Display driver positions based on session type."""
     st.subheader("📊 Driver Positions")
-    if session_type == "Race":
-        results = session.results
-        for driver_name in selected_driver_names:
-            driver_result = results[results['FullName'] == driver_name].iloc[0]
-            position = driver_result['Position']
-            st.write(f"{driver_name}: P{int(position)}")
-    elif session_type == "Qualifying":
-        results = session.results
-        for driver_name in selected_driver_names:
-            try:
-                driver_result = results[results['FullName'] == driver_name].iloc[0]
-                position = driver_result['Position']
-                st.write(f"{driver_name}: P{int(position)}")
-            except Exception as e:
+    if session_type in ("Race", "Qualifying"):
+        # Key positions by driver number and cast them to nullable integers once instead of per
+        # driver; drivers without a classified position (or any NaN in the table) fall back cleanly
+        positions = session.results.set_index('DriverNumber')['Position'].astype('Int16')
+        for driver_number, driver_name in zip(selected_driver_numbers, selected_driver_names):
+            position = positions.get(driver_number)
+            if pd.isna(position):
                 st.write(f"{driver_name}: Position not available")
+            else:
+                st.write(f"{driver_name}: P{position}")
     else:  # Practice sessions
-        all_laps = session.laps
-        all_driver_best_times = {}
-        for driver in session.drivers:
-            driver_laps = all_laps.pick_drivers(driver)
-            if not driver_laps.empty:
-                fastest_lap = driver_laps.pick_fastest()
-                if fastest_lap is not None and pd.notna(fastest_lap['LapTime']):
-                    all_driver_best_times[driver] = fastest_lap['LapTime']
-        sorted_drivers = sorted(all_driver_best_times.items(), key=lambda x: x[1])
-        position_mapping = {driver: pos + 1 for pos, (driver, _) in enumerate(sorted_drivers)}
+        # The ranking doesn't depend on the selection, so it is cached per session
+        best_times = _best_times(year, event, session_type)
+        position_mapping = {driver: (pos + 1, time_str) for pos, (driver, time_str) in enumerate(best_times)}
         for driver_number, driver_name in zip(selected_driver_numbers, selected_driver_names):
-            if driver_number in all_driver_best_times:
-                best_time = all_driver_best_times[driver_number]
-                time_str = f"{int(best_time.total_seconds() // 60)}:{int(best_time.total_seconds() % 60):02}.{int(best_time.microseconds / 1000):03}"
-                position = position_mapping[driver_number]
+            if driver_number in position_mapping:
+                position, time_str = position_mapping[driver_number]
                 st.write(f"{driver_name}: P{position} (Best: {time_str})")
             else:
                 st.write(f"{driver_name}: No valid lap time")
 
-def create_lap_times_figure(session, selected_driver_names, selected_driver_numbers):
+def create_lap_times_figure(selected_laps, selected_driver_names, selected_driver_numbers, driver_meta):
     """Create and display a figure for lap times comparison."""
-    fig_lap_times = px.line(title=f'Lap Times Comparison')
-    for driver_number, driver_name in zip(selected_driver_numbers, selected_driver_names):
-        driver_laps = session.laps.pick_drivers(driver_number).copy()
-        driver_laps['LapTimeSeconds'] = driver_laps['LapTime'].dt.total_seconds()
-        driver_laps['LapTimeFormatted'] = driver_laps['LapTime'].apply(
-            lambda x: f"{int(x.total_seconds() // 60)}:{int(x.total_seconds() % 60):02}.{int(x.microseconds / 1000):03}"
-            if pd.notnull(x) else None
-        )
-        driver_info = session.get_driver(driver_number)
-        team_color = fastf1.plotting.team_color(driver_info['TeamName'])
-        fig_lap_times.add_scatter(
-            x=driver_laps['LapNumber'],
-            y=driver_laps['LapTimeSeconds'],
-            name=driver_name,
-            line_color=team_color,
-            hovertemplate="Lap %{x}<br>Time: %{text}<extra></extra>",
-            text=driver_laps['LapTimeFormatted']
-        )
+    # Assemble every selected driver's laps into one long-format frame and build all traces in one call
+    driver_names = {num: driver_meta[num]['name'] for num in selected_driver_numbers}
+    long_df = pd.DataFrame({
+        'Driver': selected_laps['DriverNumber'].map(driver_names).to_numpy(),
+        'LapNumber': selected_laps['LapNumber'].to_numpy(),
+        'LapTimeSeconds': selected_laps['LapTime'].dt.total_seconds().to_numpy(),
+        'LapTimeFormatted': format_lap_times(selected_laps['LapTime']),
+    })
+    fig_lap_times = px.line(
+        long_df,
+        x='LapNumber',
+        y='LapTimeSeconds',
+        color='Driver',
+        color_discrete_map={meta['name']: meta['color'] for meta in driver_meta.values()},
+        category_orders={'Driver': selected_driver_names},
+        custom_data=['LapTimeFormatted'],
+        title='Lap Times Comparison'
+    )
+    fig_lap_times.update_traces(hovertemplate="Lap %{x}<br>Time: %{customdata[0]}<extra></extra>")
     fig_lap_times.update_layout(
         xaxis_title="Lap Number",
         yaxis_title="Lap Time (seconds)",
@@ -145,22 +225,34 @@ def create_lap_times_figure(session, selected_driver_names, selected_driver_numb
     )
     st.plotly_chart(fig_lap_times)
 
-def create_speed_telemetry_figure(session, selected_driver_names, selected_driver_numbers):
+def create_speed_telemetry_figure(selected_laps, selected_driver_names, selected_driver_numbers, driver_meta):
     """Create and display a figure for speed telemetry comparison."""
     st.subheader("📈 Speed Telemetry (Fastest Laps)")
     fig_telemetry = px.line(title="Speed Telemetry - Fastest Laps Comparison")
+    # Row label of every selected driver's fastest lap from one grouped argmin
+    fastest_idx = selected_laps.dropna(subset=['LapTime']).groupby('DriverNumber')['LapTime'].idxmin()
     for driver_number, driver_name in zip(selected_driver_numbers, selected_driver_names):
-        driver_laps = session.laps.pick_drivers(driver_number)
-        fastest_lap = driver_laps.pick_fastest()
+        if driver_number not in fastest_idx.index:
+            continue
+        # A single-row .loc on Laps yields a Lap, so telemetry loads as before
+        fastest_lap = selected_laps.loc[fastest_idx[driver_number]]
         telemetry = fastest_lap.get_telemetry()
-        fastest_lap_time = f"{int(fastest_lap['LapTime'].total_seconds() // 60)}:{int(fastest_lap['LapTime'].total_seconds() % 60):02}.{int(fastest_lap['LapTime'].microseconds / 1000):03}"
-        driver_info = session.get_driver(driver_number)
-        team_color = fastf1.plotting.team_color(driver_info['TeamName'])
+        if telemetry.empty:
+            continue
+        # Resample speed onto a shared uniform distance grid; keeps the chart payload small
+        # and lines up every driver's samples for the unified hover
+        distance = telemetry['Distance'].to_numpy()
+        distance_grid = np.arange(0, distance[-1], TELEMETRY_STEP_M)
+        speed = np.interp(distance_grid, distance, telemetry['Speed'].to_numpy())
+        # float32 is ample for meters and km/h, and roughly halves the serialized trace
+        distance_grid = distance_grid.astype(np.float32)
+        speed = speed.astype(np.float32)
+        fastest_lap_time = _fmt_lap(fastest_lap['LapTime'])
         fig_telemetry.add_scatter(
-            x=telemetry['Distance'],
-            y=telemetry['Speed'],
+            x=distance_grid,
+            y=speed,
             name=f"{driver_name} (Lap: {fastest_lap['LapNumber']} Time: {fastest_lap_time})",
-            line_color=team_color
+            line_color=driver_meta[driver_number]['color']
         )
     fig_telemetry.update_layout(
         xaxis_title="Distance (m)",
@@ -171,42 +263,43 @@ def create_speed_telemetry_figure(session, selected_driver_names, selected_drive
 
 def do_the_stuff():
     """Main function to run the Streamlit app."""
+    if os.environ.get('PREWARM_EVENTS'):
+        _prewarm_sessions(os.environ['PREWARM_EVENTS'])
     initialize_session_state()
-    available_years = list(range(2019, 2025))
-    year = st.selectbox("Select Year", available_years, index=len(available_years) - 1)
-    event = st.text_input("Enter Grand Prix (e.g., Monaco, Silverstone, Canada)", "Monaco")
+    year = st.selectbox("Select Year", AVAILABLE_YEARS, index=len(AVAILABLE_YEARS) - 1)
+    # Stray whitespace would otherwise load and cache the same event under another key
+    event = st.text_input("Enter Grand Prix (e.g., Monaco, Silverstone, Canada)", "Monaco").strip()
     session_type = st.selectbox("Select Session", ["Race", "Qualifying", "FP1", "FP2", "FP3"], index=0)
     check_input_changes(year, event, session_type)
     if st.button(f"Load {session_type} data"):
         load_session_data(year, event, session_type)
-    if 'data_loaded' in st.session_state and st.session_state.data_loaded and not st.session_state.hide_visi_buton:
+    if st.session_state.data_loaded and not st.session_state.hide_visi_buton:
         selected_driver_names = st.multiselect(
             "Choose any number Drivers",
             options=list(st.session_state.driver_number_name_map.values())
         )
         if selected_driver_names:
-            selected_driver_numbers = [
-                num for num, name in st.session_state.driver_number_name_map.items()
-                if name in selected_driver_names
-            ]
+            # Keep the numbers in the same order as the selected names they are zipped with
+            selected_driver_numbers = [st.session_state.driver_name_number_map[name] for name in selected_driver_names]
             if st.button("Get data visualizations"):
                 with st.spinner("Fetching driver data... ⏳"):
                     try:
-                        session = fastf1.get_session(year, event, session_type)
-                        session.load()
-                        display_driver_positions(session, session_type, selected_driver_names, selected_driver_numbers)
-                        create_lap_times_figure(session, selected_driver_names, selected_driver_numbers)
-                        create_speed_telemetry_figure(session, selected_driver_names, selected_driver_numbers)
-                        st.markdown("""
-                            <div style="text-align: center; font-size: 16px; padding-top: 10px; margin-top: 25px;">
-                                🔹 Data powered by FastF1. 🚀
-                            </div>
-                        """, unsafe_allow_html=True)
-                        st.markdown("""
-                            <div style="color: #28282B; font-size: 1.0em; display: flex; justify-content: center; align-items: center; margin: auto; background-color: #F4EBD0; height: 21px; min-width: 8em; max-width: 12.6em; margin-top: 25px;">
-                                Made by Trevor Waite
-                            </div>
-                        """, unsafe_allow_html=True)
+                        # Already loaded by the "Load data" button, so this is a cache hit
+                        session = _get_loaded_session(year, event, session_type)
+                        # Filter laps to the selected drivers and resolve each driver's name and team
+                        # color once, shared by every display below
+                        selected_laps = session.laps[session.laps['DriverNumber'].isin(selected_driver_numbers)]
+                        driver_meta = {
+                            num: {
+                                'name': st.session_state.driver_number_name_map[num],
+                                'color': _team_color(session.get_driver(num)['TeamName'])
+                            }
+                            for num in selected_driver_numbers
+                        }
+                        display_driver_positions(session, year, event, session_type, selected_driver_names, selected_driver_numbers)
+                        create_lap_times_figure(selected_laps, selected_driver_names, selected_driver_numbers, driver_meta)
+                        create_speed_telemetry_figure(selected_laps, selected_driver_names, selected_driver_numbers, driver_meta)
+                        st.markdown(FOOTER_HTML, unsafe_allow_html=True)
                     except Exception as e:
                         st.error(f"Failed to retrieve data for the selected drivers: {e}")
 